@@ -1,30 +1,158 @@
+import atexit
 import csv
+import marshal
+import math
+import operator
 import os
-import uuid
+import sys
+from array import array
+from bisect import bisect_left, insort
 from datetime import datetime
-from collections import defaultdict, namedtuple
+from collections import namedtuple
+from itertools import chain
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is optional; load() falls back to the csv module
+    pd = None
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; monthly_report falls back to a Python loop
+    np = None
 
 DATA_FILE = "expenses.csv"
 DateFmt = "%Y-%m-%d"  # ISO date format
+FLUSH_EVERY = 1000  # buffered rows written to disk per batch
+TOMBSTONE = "DEL"  # amount of a row marking the expense with that id as deleted
+VACUUM_THRESHOLD = 0.25  # rewrite the file once tombstones exceed this fraction of live rows
+REPORT_CACHE_SIZE = 32  # memoized monthly reports kept before the cache is dropped
+MAX_CENTS = 2 ** 53  # larger amounts are rejected: cents must fit the int64 column and convert to float exactly
+SIDECAR_SUFFIX = ".idx"  # marshalled parse of the data file, reused while the CSV is unchanged
+
+# year, month, amount_cents (int) and category_lc (interned, lowercased) are derived once from
+# date/amount/category so filters and reports skip re-parsing; amount stays the "%.2f" display string
+Expense = namedtuple("Expense", ["id", "date", "amount", "category", "description",
+                                 "year", "month", "amount_cents", "category_lc"])
+
+
+def _parse_date(date_str):
+    """Parse a DateFmt string. Canonical 'YYYY-MM-DD' is sliced at fixed offsets, which is
+    much cheaper than strptime; anything else goes through strptime."""
+    if (len(date_str) == 10 and date_str.isascii() and date_str[4] == "-" and date_str[7] == "-"
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit()):
+        return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
+    return datetime.strptime(date_str, DateFmt)
+
+
+def _parse_year_month(date_str):
+    """Return (year, month) for a stored date, or None if it is not a valid DateFmt date."""
+    try:
+        dt = _parse_date(date_str)
+    except ValueError:
+        return None
+    return dt.year, dt.month
+
+
+def _parse_amount(amount):
+    """Return ("%.2f" string, cents) for a stored amount, or None if it is not a finite number
+    within MAX_CENTS."""
+    try:
+        amt = float(amount)
+    except ValueError:
+        return None
+    if not math.isfinite(amt) or abs(amt) * 100 >= MAX_CENTS:
+        return None
+    cents = round(amt * 100)
+    return f"{cents / 100:.2f}", cents
+
+
+def _csv_escape(field):
+    """Quote a field the way csv.writer's default QUOTE_MINIMAL does."""
+    if "," in field or '"' in field or "\n" in field or "\r" in field:
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
+def _csv_row(fields):
+    """Format one CSV line with csv.writer's default quoting and line terminator."""
+    return ",".join(map(_csv_escape, fields)) + "\r\n"
+
+
+def _split_csv(text):
+    """Yield the fields of each CSV record in text. Lines without a quote are split with str.split;
+    a quoted record (which may span several lines) is handed to csv.reader."""
+    lines = iter(text.split("\n"))
+    for line in lines:
+        if '"' not in line:
+            line = line.rstrip("\r")
+            if line:
+                yield line.split(",")
+            continue
+        rest = (l + "\n" for l in lines)
+        yield next(csv.reader(chain([line + "\n"], rest)))
+
+
+def _id_counter(expense_id):
+    """Counter encoded in the 8-hex-digit group before the first '-' of an id (a uuid4's first
+    group also parses); -1 if there is none. Longer heads are not ours and would inflate the counter."""
+    head, sep, _ = expense_id.partition("-")
+    try:
+        return int(head, 16) if sep and len(head) <= 8 else -1
+    except ValueError:
+        return -1
 
-Expense = namedtuple("Expense", ["id", "date", "amount", "category", "description"])
 
 class ExpenseTracker:
     def __init__(self, data_file=DATA_FILE):
         self.data_file = data_file
-        self.expenses = []  # list of Expense
+        self.expenses = []  # list of Expense; deleted slots hold None until the next _reindex()
+        self._reset_columns()
+        self._append_fh = None  # opened by _ensure_file; reopened by flush after close()
+        self._at_exit = False  # close() is registered with atexit while the handle is open
+        self._pending = []  # (id or None, row) not yet written to data_file
+        self._offsets = []  # (id or None, byte offset) of each row written through _append_fh
+        self._deleted = set()  # ids with a tombstone row in data_file
+        self._version = 0  # bumped on every change to the loaded expenses
+        self._report_cache = {}  # (year, month, version) -> monthly_report result
         self._ensure_file()
         self.load()
+        # ids are "<counter:08x>-<6 random hex>": unique within the file without a uuid4 per add
+        self._id_counter = max(map(_id_counter, [*self._by_id, *self._deleted]), default=-1) + 1
 
     def _ensure_file(self):
-        """Ensure CSV file exists with header."""
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["id", "date", "amount", "category", "description"])
+        """Ensure CSV file exists with header. The append handle opened here is kept for flush()."""
+        # Append mode creates the file if needed and starts at its end, so an empty file is a new one
+        self._open_append()
+        if self._append_fh.tell() == 0:
+            self._append_fh.write(_csv_row(["id", "date", "amount", "category", "description"]).encode("utf-8"))
+            self._append_fh.flush()
 
     def add_expense(self, amount, category, date=None, description=""):
         """Add a new expense and save to file. date can be string 'YYYY-MM-DD' or None for today."""
+        new = self._make_expense(amount, category, date, description)
+        self._index(new)
+        self.expenses.append(new)
+        insort(self._ids_sorted, new.id)
+        self._version += 1
+        self._append_to_file(new)
+        return new
+
+    def add_expenses_bulk(self, rows):
+        """Add many expenses at once; rows is an iterable of dicts with add_expense's arguments.
+        Nothing is added if any row is invalid."""
+        new = [self._make_expense(**r) for r in rows]
+        self.flush()  # keep file order when earlier rows are still buffered
+        self.expenses.extend(new)
+        for e in new:
+            self._index(e)
+        self._ids_sorted.extend(e.id for e in new)
+        self._ids_sorted.sort()
+        self._version += 1
+        self._pending = [(e.id, _csv_row([e.id, e.date, e.amount, e.category, e.description])) for e in new]
+        self.flush()
+        return new
+
+    def _make_expense(self, amount, category, date=None, description=""):
         if date is None:
             date_obj = datetime.today()
         else:
@@ -36,68 +164,329 @@ class ExpenseTracker:
             amt = float(amount)
         except ValueError:
             raise ValueError("Amount must be a number.")
-        new = Expense(id=str(uuid.uuid4()), date=date_obj.strftime(DateFmt),
-                      amount=f"{amt:.2f}", category=category.strip(), description=description.strip())
-        self.expenses.append(new)
-        self._append_to_file(new)
-        return new
+        if not math.isfinite(amt):
+            raise ValueError("Amount must be a number.")
+        if abs(amt) * 100 >= MAX_CENTS:
+            raise ValueError("Amount is too large.")
+        cents = round(amt * 100)
+        category = category.strip()
+        new_id = f"{self._id_counter:08x}-{os.urandom(3).hex()}"
+        self._id_counter += 1
+        return Expense(id=new_id, date=date_obj.strftime(DateFmt),
+                       amount=f"{cents / 100:.2f}", category=category, description=description.strip(),
+                       year=date_obj.year, month=date_obj.month, amount_cents=cents,
+                       category_lc=sys.intern(category.lower()))
 
     def _append_to_file(self, expense):
-        with open(self.data_file, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([expense.id, expense.date, expense.amount, expense.category, expense.description])
+        self._pending.append((expense.id, _csv_row([expense.id, expense.date, expense.amount,
+                                                    expense.category, expense.description])))
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows to the data file."""
+        if not self._pending:
+            return
+        if self._append_fh is None:
+            self._open_append()
+        pos = self._append_fh.tell()
+        chunks = []
+        offsets = []
+        for expense_id, row in self._pending:
+            data = row.encode("utf-8")
+            offsets.append((expense_id, pos))
+            pos += len(data)
+            chunks.append(data)
+        self._append_fh.write(b"".join(chunks))
+        self._pending = []
+        self._append_fh.flush()
+        # Record offsets only once the rows are on disk, so a failed write leaves none pointing past EOF
+        self._offsets.extend(offsets)
+
+    def close(self):
+        """Flush buffered rows and close the data file."""
+        self.flush()
+        self._close_append()
+        if self._at_exit:
+            atexit.unregister(self.close)  # atexit would otherwise keep this tracker alive
+            self._at_exit = False
+
+    def _open_append(self):
+        """Open the append handle; buffered rows are flushed at interpreter exit until close()."""
+        self._append_fh = open(self.data_file, "ab", buffering=1 << 20)
+        if not self._at_exit:
+            atexit.register(self.close)
+            self._at_exit = True
+
+    def _close_append(self):
+        if self._append_fh is not None:
+            self._append_fh.close()
+            self._append_fh = None
+        self._offsets = []
 
     def load(self):
-        """Load expenses from CSV into memory."""
-        self.expenses = []
+        """Load expenses from CSV into memory. The parse is cached in <data_file>.idx (marshal,
+        written via <data_file>.idx.tmp) and reused while the CSV's mtime and size are unchanged;
+        deleting it is always safe."""
+        self.flush()
+        self._deleted = set()
+        self._version += 1
+        st = os.stat(self.data_file)
+        stamp = (st.st_mtime_ns, st.st_size)
+        expenses = self._load_sidecar(stamp)
+        if expenses is None:
+            expenses = self._load_pandas() if pd is not None else self._load_csv()
+            self._save_sidecar(stamp, expenses)
+        self.expenses = expenses
+        self._reindex()
+
+    def _load_sidecar(self, stamp):
+        """Expenses from the sidecar file if it was written for this exact CSV (same mtime and size)."""
+        try:
+            with open(self.data_file + SIDECAR_SUFFIX, "rb") as f:
+                # marshal only rebuilds plain values, so unlike pickle a tampered file cannot run code
+                idx = marshal.load(f)
+            if idx["stamp"] != stamp or idx["fields"] != Expense._fields:
+                return None
+            cols = idx["cols"]
+            # Re-intern category_lc so list_expenses' identity check still holds
+            expenses = list(map(Expense._make, zip(*cols[:-1], map(sys.intern, cols[-1]))))
+        except Exception:  # missing, unreadable or from an older layout: parse the CSV instead
+            return None
+        self._deleted = set(idx["deleted"])
+        return expenses
+
+    def _save_sidecar(self, stamp, expenses):
+        """Store the parsed expenses as columns next to the CSV for the next load()."""
+        cols = list(zip(*expenses)) if expenses else [() for _ in Expense._fields]
+        path = self.data_file + SIDECAR_SUFFIX
+        try:
+            with open(path + ".tmp", "wb") as f:
+                marshal.dump({"stamp": stamp, "fields": Expense._fields, "cols": cols,
+                              "deleted": list(self._deleted)}, f)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass  # the sidecar is only a cache
+
+    def _load_csv(self):
+        """Parse the CSV with the standard library only."""
         with open(self.data_file, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for r in reader:
-                # Basic validation and normalization
-                try:
-                    amt = float(r["amount"])
-                except Exception:
-                    continue
-                date_str = r["date"]
-                # Ensure date format
-                try:
-                    datetime.strptime(date_str, DateFmt)
-                except Exception:
-                    continue
-                exp = Expense(id=r["id"], date=date_str, amount=f"{amt:.2f}",
-                              category=r.get("category", "").strip(), description=r.get("description", "").strip())
-                self.expenses.append(exp)
+            rows = _split_csv(f.read())
+        header = next(rows, None)
+        if header is None:
+            return []
+        width = len(header)
+        # Optional columns absent from the header read as "" via padding appended to every row
+        missing = [c for c in ("category", "description") if c not in header]
+        header, pad = header + missing, [""] * len(missing)
+        i_id, i_date, i_amount, i_cat, i_desc = map(header.index, ["id", "date", "amount", "category", "description"])
+        # Dates, amounts and categories repeat heavily, so each distinct string is parsed once;
+        # None marks a value that failed validation.
+        dates = {}  # date -> (year, month)
+        amounts = {}  # amount -> ("%.2f" string, cents)
+        cats = {}  # category -> (stripped, interned lowercase)
+        deleted = self._deleted
+        expenses = []
+        append = expenses.append
+        for r in rows:
+            if len(r) != width:
+                # Extra fields are ignored (as csv.DictReader did); missing trailing fields read as empty
+                r = r[:width] if len(r) > width else r + [""] * (width - len(r))
+            if pad:
+                r = r + pad
+            amount = r[i_amount]
+            if amount == TOMBSTONE:
+                deleted.add(r[i_id])
+                continue
+            # Basic validation and normalization
+            amt = amounts.get(amount, False)
+            if amt is False:
+                amt = amounts[amount] = _parse_amount(amount)
+            if amt is None:
+                continue
+            date_str = r[i_date]
+            ym = dates.get(date_str, False)
+            if ym is False:
+                ym = dates[date_str] = _parse_year_month(date_str)
+            if ym is None:
+                continue
+            cat = cats.get(r[i_cat])
+            if cat is None:
+                stripped = r[i_cat].strip()
+                cat = cats[r[i_cat]] = (stripped, sys.intern(stripped.lower()))
+            append(Expense(r[i_id], date_str, amt[0], cat[0], r[i_desc].strip(), ym[0], ym[1], amt[1], cat[1]))
+        if self._deleted:
+            expenses = [e for e in expenses if e.id not in self._deleted]
+        return expenses
+
+    def _reset_columns(self):
+        """Column arrays (one slot per row of self.expenses) that monthly_report scans,
+        plus the id lookups used by delete_expense and find_by_prefix."""
+        self._amounts = array("q")  # cents
+        self._cat_codes = array("I")
+        self._cat_names = []  # code -> category
+        self._cat_ids = {}  # category -> code
+        self._by_id = {}  # id -> index into self.expenses
+        self._by_month = {}  # (year, month) -> indexes into self.expenses
+        self._ids_sorted = []  # live ids, for prefix search
+        self._holes = 0  # None slots in self.expenses
+
+    def _index(self, exp):
+        """Append one expense to the column arrays, the id map and its month bucket.
+        The array appends, the only steps that can fail, run before anything else changes."""
+        idx = len(self._cat_codes)
+        code = self._cat_ids.get(exp.category)
+        new_cat = code is None
+        if new_cat:
+            code = len(self._cat_names)
+        self._amounts.append(exp.amount_cents)
+        try:
+            self._cat_codes.append(code)
+        except OverflowError:
+            self._amounts.pop()
+            raise
+        if new_cat:
+            self._cat_ids[exp.category] = code
+            self._cat_names.append(exp.category)
+        self._by_id[exp.id] = idx
+        self._by_month.setdefault((exp.year, exp.month), []).append(idx)
+
+    def _reindex(self):
+        """Drop deleted slots from self.expenses and rebuild the column arrays and id lookups."""
+        if self._holes:
+            self.expenses = [e for e in self.expenses if e is not None]
+        self._reset_columns()
+        expenses = self.expenses
+        # Build each column in one pass rather than calling _index per row
+        self._cat_names = list(dict.fromkeys(e.category for e in expenses))
+        self._cat_ids = cat_ids = {c: code for code, c in enumerate(self._cat_names)}
+        self._cat_codes = array("I", [cat_ids[e.category] for e in expenses])
+        self._amounts = array("q", [e.amount_cents for e in expenses])
+        self._by_id = {e.id: i for i, e in enumerate(expenses)}
+        by_month = self._by_month
+        for i, e in enumerate(expenses):
+            bucket = by_month.get((e.year, e.month))
+            if bucket is None:
+                by_month[e.year, e.month] = [i]
+            else:
+                bucket.append(i)
+        self._ids_sorted = sorted(self._by_id)
+
+    def find_by_prefix(self, prefix):
+        """Return expenses whose id starts with prefix, in id order."""
+        ids = self._ids_sorted
+        lo = bisect_left(ids, prefix)
+        hi = bisect_left(ids, prefix + "\uffff", lo)
+        return [self.expenses[self._by_id[i]] for i in ids[lo:hi]]
+
+    def _load_pandas(self):
+        """Parse the whole CSV with pandas' C reader. Rows are validated the same way as in
+        _load_csv, so both paths load the same expenses from the same file."""
+        # Extra fields are ignored and missing trailing fields read as "", as in _load_csv.
+        # index_col=False stops pandas from treating the first column of such rows as an index.
+        df = pd.read_csv(self.data_file, dtype=str, keep_default_na=False, encoding="utf-8", index_col=False,
+                         usecols=lambda c: c in ("id", "date", "amount", "category", "description"))
+        for col in ("category", "description"):
+            if col not in df:
+                df[col] = ""
+        tombstones = df["amount"] == TOMBSTONE
+        self._deleted = set(df.loc[tombstones, "id"].tolist())
+        df = df[~(tombstones | df["id"].isin(self._deleted))]
+        # Each distinct amount and date string goes through the same helpers as _load_csv
+        amounts = df["amount"].map({a: _parse_amount(a) for a in df["amount"].unique()})
+        dates = df["date"].map({d: _parse_year_month(d) for d in df["date"].unique()})
+        valid = amounts.notna() & dates.notna()
+        df, amounts, dates = df[valid], amounts[valid].tolist(), dates[valid].tolist()
+        cats = df["category"].str.strip()
+        descs = df["description"].str.strip()
+        cats_lc = map(sys.intern, cats.str.lower().tolist())
+        return list(map(Expense._make, zip(df["id"].tolist(), df["date"].tolist(), [a[0] for a in amounts],
+                                           cats.tolist(), descs.tolist(), [d[0] for d in dates],
+                                           [d[1] for d in dates], [a[1] for a in amounts], cats_lc)))
 
     def list_expenses(self, year=None, month=None, category=None, limit=None):
         """Return list of expenses optionally filtered by year, month (int), or category."""
+        # interned on both sides, so matching categories are the same object
+        cat_lc = sys.intern(category.lower()) if category is not None else None
+        if year is not None and month is not None:
+            expenses = [self.expenses[i] for i in self._by_month.get((year, month), ())]
+        else:
+            expenses = self.expenses
         results = []
-        for e in self.expenses:
-            dt = datetime.strptime(e.date, DateFmt)
-            if year is not None and dt.year != year:
+        for e in expenses:
+            if e is None:
+                continue
+            if year is not None and e.year != year:
                 continue
-            if month is not None and dt.month != month:
+            if month is not None and e.month != month:
                 continue
-            if category is not None and e.category.lower() != category.lower():
+            if cat_lc is not None and e.category_lc is not cat_lc:
                 continue
             results.append(e)
         # sort by date descending
-        results.sort(key=lambda x: x.date, reverse=True)
+        results.sort(key=operator.attrgetter("date"), reverse=True)  # ISO dates sort as strings
         if limit:
             return results[:limit]
         return results
 
     def monthly_report(self, year, month):
-        """Return a dict: {category: {"amount": total, "count": n}} plus overall total."""
-        totals = defaultdict(lambda: {"amount": 0.0, "count": 0})
-        total_spent = 0.0
-        for e in self.list_expenses(year=year, month=month):
-            amt = float(e.amount)
-            totals[e.category]["amount"] += amt
-            totals[e.category]["count"] += 1
-            total_spent += amt
-        # Convert amounts to 2-decimal strings for display/export
-        report = {cat: {"amount": round(vals["amount"], 2), "count": vals["count"]} for cat, vals in totals.items()}
-        return {"year": year, "month": month, "categories": report, "total_spent": round(total_spent, 2)}
+        """Return a dict: {category: {"amount": total, "count": n}} plus overall total.
+        Results are cached until the expenses change, so treat the returned dict as read-only."""
+        key = (year, month, self._version)
+        report = self._report_cache.get(key)
+        if report is None:
+            if len(self._report_cache) >= REPORT_CACHE_SIZE:
+                self._report_cache.clear()
+            compute = self._monthly_report_np if np is not None else self._monthly_report_py
+            report = self._report_cache[key] = compute(year, month)
+        return report
+
+    def _categories_by_recency(self, idx):
+        """Categories of the rows at idx (ascending) in the order list_expenses' newest-first
+        listing shows them first; monthly_report keeps its categories in this order."""
+        expenses = self.expenses
+        first = {}  # category -> (date, -index) of the row listed first
+        for i in idx:
+            e = expenses[i]
+            seen = first.get(e.category)
+            if seen is None or e.date > seen[0]:
+                first[e.category] = (e.date, -i)
+        return sorted(first, key=first.__getitem__, reverse=True)
+
+    def _monthly_report_py(self, year, month):
+        """monthly_report as a plain loop, used when numpy is not installed."""
+        amts = {}  # category -> cents
+        cnts = {}  # category -> rows
+        amts_get = amts.get
+        cnts_get = cnts.get
+        total_spent = 0
+        expenses = self.expenses
+        for i in self._by_month.get((year, month), ()):
+            e = expenses[i]
+            cat = e.category
+            amts[cat] = amts_get(cat, 0) + e.amount_cents
+            cnts[cat] = cnts_get(cat, 0) + 1
+            total_spent += e.amount_cents
+        # Sums are exact integer cents; convert to currency units once at the end
+        report = {cat: {"amount": amts[cat] / 100, "count": cnts[cat]}
+                  for cat in self._categories_by_recency(self._by_month.get((year, month), ()))}
+        return {"year": year, "month": month, "categories": report, "total_spent": total_spent / 100}
+
+    def _monthly_report_np(self, year, month):
+        """monthly_report over the column arrays: gather the month's rows, then one bincount per category code."""
+        idx = self._by_month.get((year, month), [])
+        # frombuffer views share memory with the arrays; the gathers below copy, so no view outlives
+        # this statement (an array cannot grow while a view is exported).
+        codes = np.frombuffer(self._cat_codes, dtype=np.uint32)[idx]
+        amounts = np.frombuffer(self._amounts, dtype=np.int64)[idx]
+        n = len(self._cat_names)
+        sums = np.bincount(codes, weights=amounts, minlength=n)
+        counts = np.bincount(codes, minlength=n)
+        # float64 sums of integer cents stay exact below 2**53
+        cat_ids = self._cat_ids
+        report = {cat: {"amount": int(sums[cat_ids[cat]]) / 100, "count": int(counts[cat_ids[cat]])}
+                  for cat in self._categories_by_recency(idx)}
+        return {"year": year, "month": month, "categories": report, "total_spent": int(amounts.sum()) / 100}
 
     def export_report_csv(self, report, filename):
         """Export monthly report (from monthly_report) to CSV."""
@@ -107,8 +496,7 @@ class ExpenseTracker:
         rows.append([])
         rows.append(["Total", f"{report['total_spent']:.2f}", ""])
         with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerows(rows)
+            f.write("".join(map(_csv_row, rows)))
         return filename
 
     def export_report_text(self, report, filename):
@@ -132,32 +520,74 @@ class ExpenseTracker:
         return filename
 
     def delete_expense(self, expense_id):
-        """Delete expense by id. Will rewrite file."""
-        before = len(self.expenses)
-        self.expenses = [e for e in self.expenses if e.id != expense_id]
-        after = len(self.expenses)
-        if before == after:
+        """Delete expense by id. The most recently added row is simply dropped from the buffer or the file;
+        other rows get a tombstone row, and vacuum() rewrites the file once enough pile up."""
+        idx = self._by_id.pop(expense_id, None)
+        if idx is None:
+            return False
+        exp = self.expenses[idx]
+        self._by_month[exp.year, exp.month].remove(idx)
+        del self._ids_sorted[bisect_left(self._ids_sorted, expense_id)]
+        self._version += 1
+        if idx == len(self.expenses) - 1:
+            self.expenses.pop()
+            self._amounts.pop()
+            self._cat_codes.pop()
+        else:
+            self.expenses[idx] = None
+            self._holes += 1
+            if self._holes > VACUUM_THRESHOLD * len(self.expenses):
+                self._reindex()
+        if self._drop_last_row(expense_id):
+            return True
+        self._deleted.add(expense_id)
+        self._pending.append((None, _csv_row([expense_id, "", TOMBSTONE, "", ""])))
+        if not self.vacuum():
+            self.flush()
+        return True
+
+    def _drop_last_row(self, expense_id):
+        """Remove expense_id's row without a tombstone if it is the last row appended by this
+        tracker: still buffered, or cut off the end of the file. Returns False otherwise."""
+        if self._pending:
+            if self._pending[-1][0] != expense_id:
+                return False
+            self._pending.pop()
+            return True
+        if not self._offsets or self._offsets[-1][0] != expense_id:
             return False
-        # rewrite CSV
-        with open(self.data_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "date", "amount", "category", "description"])
-            for e in self.expenses:
-                writer.writerow([e.id, e.date, e.amount, e.category, e.description])
+        self._append_fh.seek(self._offsets.pop()[1])
+        self._append_fh.truncate()
+        return True
+
+    def vacuum(self, threshold=VACUUM_THRESHOLD):
+        """Rewrite the data file without tombstones if they exceed threshold * live rows.
+        Use threshold=0 to compact whenever any tombstone exists. Returns True if the file was rewritten."""
+        if not self._deleted or len(self._deleted) <= threshold * len(self._by_id):
+            return False
+        if self._holes:
+            self._reindex()
+        self._pending = []  # everything buffered is either in self.expenses or a tombstone
+        self._close_append()
+        rows = [_csv_row(["id", "date", "amount", "category", "description"])]
+        rows.extend(_csv_row([e.id, e.date, e.amount, e.category, e.description]) for e in self.expenses)
+        with open(self.data_file, "wb", buffering=1 << 20) as f:
+            f.write("".join(rows).encode("utf-8"))
+        self._deleted = set()
         return True
 
 
 def prompt_date(prompt_msg="Enter date (YYYY-MM-DD) [default today]: "):
-    entry = input(prompt_msg).strip()
-    if entry == "":
-        return None
-    # validate
-    try:
-        datetime.strptime(entry, DateFmt)
-        return entry
-    except ValueError:
-        print("Invalid date format. Use YYYY-MM-DD.")
-        return prompt_date(prompt_msg)
+    while True:
+        entry = input(prompt_msg).strip()
+        if entry == "":
+            return None
+        # validate
+        try:
+            datetime.strptime(entry, DateFmt)
+            return entry
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD.")
 
 
 def main_menu():
@@ -178,6 +608,7 @@ def main_menu():
             desc = input("Description (optional): ").strip()
             try:
                 new = tracker.add_expense(amount=amt, category=cat, date=date, description=desc)
+                tracker.flush()  # write interactive entries immediately; batching is for bulk use
                 print(f"Added: {new.date} | {new.category} | ₹{new.amount} | {new.description}")
             except Exception as e:
                 print("Error adding expense:", e)
@@ -241,7 +672,7 @@ def main_menu():
                 print("No id entered.")
                 continue
             # Try to find full id
-            matches = [e for e in tracker.expenses if e.id.startswith(eid)]
+            matches = tracker.find_by_prefix(eid)
             if not matches:
                 print("No expense found with that id prefix.")
                 continue
@@ -253,6 +684,7 @@ def main_menu():
             confirm = input(f"Delete expense {matches[0].id[:8]} {matches[0].date} {matches[0].category} ₹{matches[0].amount}? (y/N): ").strip().lower()
             if confirm == "y":
                 ok = tracker.delete_expense(matches[0].id)
+                tracker.flush()
                 if ok:
                     print("Deleted.")
                 else:
@@ -260,6 +692,7 @@ def main_menu():
             else:
                 print("Aborted.")
         elif choice == "6":
+            tracker.close()
             print("Bye.")
             break
         else: